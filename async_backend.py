@@ -0,0 +1,104 @@
+"""Asyncio variant of the read endpoints, served by Quart on an asyncpg pool.
+
+Reuses the SQL, token handling, save graph and response encoding from
+flask-backend.py, so only the I/O path differs from the sync app. Run with
+an ASGI server, e.g. `hypercorn "async_backend:create_async_app()"`.
+"""
+from functools import wraps
+import asyncio
+import importlib
+
+from quart import Quart, Response, current_app, jsonify, request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+backend = importlib.import_module('flask-backend')
+
+RECIPES_QUERY = text(backend.RECIPES_SQL)
+SEARCH_QUERY = text(backend.SEARCH_SQL)
+USER_STATS_QUERY = text(backend.USER_STATS_SQL)
+
+def async_database_uri(uri):
+    return uri.replace('postgresql://', 'postgresql+asyncpg://', 1)
+
+def create_async_app(config=None):
+    app = Quart(__name__)
+    app.config.update(backend.load_config())
+    if config:
+        app.config.update(config)
+
+    engine_options = app.config['SQLALCHEMY_ENGINE_OPTIONS']
+    app.extensions['engine'] = create_async_engine(
+        async_database_uri(app.config['SQLALCHEMY_DATABASE_URI']),
+        **engine_options
+    )
+    app.extensions['save_graph'] = backend.SaveGraph()
+    app.extensions['prefix_index'] = backend.PrefixIndex()
+
+    @app.before_serving
+    async def start_listener():
+        await asyncio.to_thread(backend.start_change_listener, app)
+
+    @app.after_serving
+    async def stop_listener():
+        await asyncio.to_thread(backend.stop_change_listener, app)
+        await app.extensions['engine'].dispose()
+
+    app.add_url_rule('/api/recipes', view_func=get_recipes, methods=['GET'])
+    app.add_url_rule('/api/recipes/search', view_func=search_recipes, methods=['GET'])
+    app.add_url_rule('/api/user/statistics', view_func=get_user_stats, methods=['GET'])
+    return app
+
+async def fetch_all(query, params=None):
+    async with current_app.extensions['engine'].connect() as conn:
+        result = await conn.execute(query, params or {})
+        return [dict(row._mapping) for row in result.fetchall()]
+
+def _rank_and_encode(recipes, save_graph, user_id, accept_mimetypes, accept_encodings):
+    recipes = backend.rank_recipes(recipes, save_graph, user_id)
+    return backend.encode_payload(recipes, accept_mimetypes, accept_encodings)
+
+async def ranked_response(recipes, user_id=None):
+    # Ranking sorts every row and encoding may compress a large body; either
+    # would stall the event loop, so both run in one worker thread
+    body, mimetype, headers = await asyncio.to_thread(
+        _rank_and_encode,
+        recipes,
+        current_app.extensions['save_graph'],
+        user_id,
+        request.accept_mimetypes,
+        request.accept_encodings
+    )
+    return Response(body, mimetype=mimetype, headers=headers)
+
+def token_required(f):
+    @wraps(f)
+    async def decorated(*args, **kwargs):
+        token = request.headers.get('Authorization')
+        if not token:
+            return jsonify({'message': 'Token is missing'}), 401
+        current_user_id = backend.decode_token(token, current_app.config['SECRET_KEY'])
+        if current_user_id is None:
+            return jsonify({'message': 'Invalid token'}), 401
+        return await f(current_user_id, *args, **kwargs)
+    return decorated
+
+@token_required
+async def get_recipes(current_user_id):
+    return await ranked_response(await fetch_all(RECIPES_QUERY), current_user_id)
+
+@token_required
+async def get_user_stats(current_user_id):
+    stats = await fetch_all(USER_STATS_QUERY, {'user_id': current_user_id})
+    return jsonify(stats[0] if stats else {})
+
+@token_required
+async def search_recipes(current_user_id):
+    query = request.args.get('q', '')
+    dietary_pref = request.args.get('dietary_preference', '')
+    return await ranked_response(
+        await fetch_all(SEARCH_QUERY, backend.search_params(query, dietary_pref))
+    )
+
+if __name__ == '__main__':
+    create_async_app().run()
@@ -0,0 +1,78 @@
+"""Load-test the sync (flask-backend.py / serve.py) and async (async_backend.py) read paths.
+
+Usage: python benchmark-async.py SYNC_URL ASYNC_URL TOKEN [REQUESTS_PER_CLIENT]
+
+Both servers should point at the same database. For each concurrency level
+every endpoint is hit by that many concurrent clients; throughput, latency
+percentiles and error counts are reported side by side.
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+import aiohttp
+
+CONCURRENCY_LEVELS = (100, 250, 500, 1000)
+ENDPOINTS = (
+    '/api/recipes',
+    '/api/recipes/search?q=chicken',
+    '/api/user/statistics',
+)
+
+async def client(session, url, token, requests, latencies, errors):
+    for _ in range(requests):
+        start = time.perf_counter()
+        try:
+            async with session.get(url, headers={'Authorization': token}) as response:
+                await response.read()
+                if response.status != 200:
+                    errors.append(response.status)
+                    continue
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+async def run_level(base_url, endpoint, token, concurrency, requests):
+    latencies = []
+    errors = []
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=60)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            client(session, base_url + endpoint, token, requests, latencies, errors)
+            for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+def percentile(values, fraction):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+async def main():
+    if len(sys.argv) < 4:
+        sys.exit(__doc__)
+    targets = {'sync': sys.argv[1].rstrip('/'), 'async': sys.argv[2].rstrip('/')}
+    token = sys.argv[3]
+    requests = int(sys.argv[4]) if len(sys.argv) > 4 else 10
+
+    print(f"{'endpoint':<32}{'clients':>8}{'path':>7}{'req/s':>10}"
+          f"{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for endpoint in ENDPOINTS:
+        for concurrency in CONCURRENCY_LEVELS:
+            for name, base_url in targets.items():
+                latencies, errors, elapsed = await run_level(
+                    base_url, endpoint, token, concurrency, requests
+                )
+                print(f"{endpoint:<32}{concurrency:>8}{name:>7}"
+                      f"{len(latencies) / elapsed:>10.1f}"
+                      f"{statistics.median(latencies) * 1000 if latencies else float('nan'):>10.1f}"
+                      f"{percentile(latencies, 0.99) * 1000:>10.1f}{len(errors):>8}")
+
+if __name__ == '__main__':
+    asyncio.run(main())
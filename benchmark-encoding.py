@@ -0,0 +1,88 @@
+"""Compare bytes on the wire and serialization CPU for recipe list responses.
+
+Mirrors the encodings negotiated by flask-backend.py (JSON / MessagePack,
+identity / gzip / zstd) on a synthetic payload shaped like /api/recipes.
+"""
+import gzip
+import json
+import random
+import sys
+import time
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+ROUNDS = 20
+
+WORDS = ["onion", "garlic", "butter", "flour", "sugar", "salt", "pepper", "tomato",
+         "basil", "chicken", "rice", "lemon", "olive oil", "cumin", "paprika", "egg"]
+
+def make_recipes(count):
+    rng = random.Random(42)
+    recipes = []
+    for i in range(count):
+        ingredients = "\n".join(
+            f"{rng.randint(1, 4)} cups {rng.choice(WORDS)}" for _ in range(rng.randint(5, 15))
+        )
+        instructions = " ".join(
+            f"Step {n + 1}: mix the {rng.choice(WORDS)} with the {rng.choice(WORDS)} and cook."
+            for n in range(rng.randint(4, 12))
+        )
+        recipes.append({
+            'recipe_id': i,
+            'title': f"{rng.choice(WORDS).title()} and {rng.choice(WORDS)} #{i}",
+            'author': f"user{rng.randint(1, 500)}",
+            'description': "A simple weeknight dish.",
+            'ingredients': ingredients,
+            'instructions': instructions,
+            'creator': f"user{rng.randint(1, 500)}",
+            'save_count': rng.randint(0, 1000),
+            'unique_savers': rng.randint(0, 1000),
+            'is_saved': rng.random() < 0.1,
+        })
+    return recipes
+
+def timed(fn):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        result = fn()
+    return result, (time.perf_counter() - start) / ROUNDS * 1000
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    recipes = make_recipes(count)
+
+    serializers = {
+        'json': lambda: json.dumps(recipes, default=str, separators=(',', ':')).encode('utf-8'),
+    }
+    if msgpack is not None:
+        serializers['msgpack'] = lambda: msgpack.packb(recipes, default=str, use_bin_type=True)
+
+    compressors = {
+        'identity': lambda body: body,
+        'gzip': lambda body: gzip.compress(body, compresslevel=GZIP_LEVEL),
+    }
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        compressors['zstd'] = compressor.compress
+
+    print(f"{count} recipes, {ROUNDS} rounds each")
+    print(f"{'format':<10}{'encoding':<10}{'bytes':>12}{'serialize ms':>15}{'compress ms':>14}")
+    for format_name, serialize in serializers.items():
+        body, serialize_ms = timed(serialize)
+        for encoding_name, compress in compressors.items():
+            wire, compress_ms = timed(lambda: compress(body))
+            print(f"{format_name:<10}{encoding_name:<10}{len(wire):>12}"
+                  f"{serialize_ms:>15.2f}{compress_ms:>14.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""Data-scale benchmark for the saved_recipes layouts managed by saved_recipes_layout.py.
+
+Builds a scratch schema with synthetic users, recipes and saves (10M by
+default), then times every query that reads saved_recipes under three layouts:
+
+  plain        heap table with only a serial id, as the project ships today
+  indexed      + unique (user_id, recipe_id) and covering (recipe_id, user_id)
+  partitioned  the same indexes on a table hash-partitioned by user_id
+
+Usage: python benchmark-saved-recipes.py [--rows N] [--users N] [--recipes N]
+                                         [--partitions N] [--explain] [--keep]
+Connects to DATABASE_URL; everything lives in the bench_saved_recipes schema.
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+
+import psycopg2
+
+from saved_recipes_layout import DEFAULT_DATABASE_URL, create_indexes, create_partitioned_table
+
+SCHEMA = 'bench_saved_recipes'
+LAYOUTS = ('plain', 'indexed', 'partitioned')
+POINT_REPEATS = 200
+SCAN_REPEATS = 3
+
+# (name, sql, repeats); mirrors the queries the apps run against saved_recipes
+QUERIES = [
+    ('is_recipe_saved',
+     "SELECT 1 FROM saved_recipes WHERE recipe_id = %(recipe_id)s AND user_id = %(user_id)s;",
+     POINT_REPEATS),
+    ('fetch_saved_recipes', """
+        SELECT r.id, r.title, r.author, r.description, r.ingredients,
+               r.instructions, r.saved, r.recipe_id, r.user_id
+        FROM recipes r
+        WHERE (r.recipe_id IN (
+                   SELECT sr.recipe_id FROM saved_recipes sr WHERE sr.user_id = %(user_id)s
+               ) OR r.recipe_id = ANY('{}'::int[]))
+          AND NOT r.recipe_id = ANY('{}'::int[]);
+     """, POINT_REPEATS),
+    ('trigger_not_exists',
+     "SELECT NOT EXISTS (SELECT 1 FROM saved_recipes WHERE recipe_id = %(recipe_id)s);",
+     POINT_REPEATS),
+    # Core of get_user_statistics (joins and aggregates, minus the popular-recipe window)
+    ('user_statistics', """
+        SELECT
+            COUNT(DISTINCT r.recipe_id),
+            COUNT(DISTINCT sr.recipe_id),
+            COALESCE(AVG(recipe_saves.save_count), 0)
+        FROM users u
+        LEFT JOIN recipes r ON u.user_id = r.user_id
+        LEFT JOIN saved_recipes sr ON u.user_id = sr.user_id
+        LEFT JOIN (
+            SELECT recipe_id, COUNT(*) as save_count
+            FROM saved_recipes
+            GROUP BY recipe_id
+        ) recipe_saves ON r.recipe_id = recipe_saves.recipe_id
+        WHERE u.user_id = %(user_id)s;
+     """, SCAN_REPEATS),
+    ('recipe_stats_cte', """
+        SELECT
+            r.recipe_id,
+            COUNT(sr.id) as save_count,
+            COUNT(DISTINCT sr.user_id) as unique_savers
+        FROM recipes r
+        LEFT JOIN saved_recipes sr ON r.recipe_id = sr.recipe_id
+        GROUP BY r.recipe_id;
+     """, SCAN_REPEATS),
+    ('save_graph_load',
+     "SELECT user_id, recipe_id FROM saved_recipes ORDER BY user_id, recipe_id;",
+     SCAN_REPEATS),
+]
+
+def create_dataset(cursor, rows, users, recipes):
+    cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;")
+    cursor.execute(f"CREATE SCHEMA {SCHEMA};")
+    cursor.execute(f"SET search_path TO {SCHEMA};")
+    cursor.execute("""
+        CREATE TABLE users AS
+        SELECT g AS user_id, 'user' || g AS username
+        FROM generate_series(1, %s) g;
+        ALTER TABLE users ADD PRIMARY KEY (user_id);
+    """, (users,))
+    cursor.execute("""
+        CREATE TABLE recipes AS
+        SELECT g AS id, g AS recipe_id, 'Recipe ' || g AS title, 'author' AS author,
+               'description' AS description, 'ingredients' AS ingredients,
+               'instructions' AS instructions, true AS saved,
+               (g %% %s) + 1 AS user_id, true AS is_public
+        FROM generate_series(1, %s) g;
+        ALTER TABLE recipes ADD PRIMARY KEY (recipe_id);
+        CREATE INDEX ON recipes (user_id);
+    """, (users, recipes))
+    # Unique (user_id, recipe_id) pairs: each user saves every stride-th recipe
+    cursor.execute("""
+        CREATE TABLE saved_recipes_src AS
+        SELECT g AS id,
+               (g %% %(users)s) + 1 AS user_id,
+               ((g / %(users)s) * 7919 + (g %% %(users)s) * 31) %% %(recipes)s + 1 AS recipe_id
+        FROM generate_series(0, %(rows)s - 1) g;
+    """, {'users': users, 'recipes': recipes, 'rows': rows})
+
+def build_layout(cursor, layout, partitions):
+    cursor.execute("DROP TABLE IF EXISTS saved_recipes CASCADE;")
+    if layout == 'partitioned':
+        create_partitioned_table(cursor, 'saved_recipes', 'saved_recipes_src', partitions)
+        cursor.execute("INSERT INTO saved_recipes SELECT * FROM saved_recipes_src;")
+    else:
+        cursor.execute("CREATE TABLE saved_recipes AS SELECT * FROM saved_recipes_src;")
+        cursor.execute("ALTER TABLE saved_recipes ADD PRIMARY KEY (id);")
+    if layout != 'plain':
+        create_indexes(cursor, 'saved_recipes')
+    cursor.execute("ANALYZE saved_recipes;")
+
+def time_query(cursor, query, repeats, users, recipes, rng, explain):
+    timings = []
+    for _ in range(repeats):
+        params = {'user_id': rng.randint(1, users), 'recipe_id': rng.randint(1, recipes)}
+        start = time.perf_counter()
+        cursor.execute(query, params)
+        cursor.fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    if explain:
+        cursor.execute("EXPLAIN (ANALYZE, BUFFERS) " + query, params)
+        for (line,) in cursor.fetchall():
+            print(f"      {line}")
+    return statistics.median(timings), max(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--users', type=int, default=200_000)
+    parser.add_argument('--recipes', type=int, default=1_000_000)
+    parser.add_argument('--partitions', type=int, default=16)
+    parser.add_argument('--explain', action='store_true', help='print a plan for each query')
+    parser.add_argument('--keep', action='store_true', help=f'keep the {SCHEMA} schema afterwards')
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(os.environ.get('DATABASE_URL', DEFAULT_DATABASE_URL))
+    conn.autocommit = True
+    cursor = conn.cursor()
+    try:
+        start = time.perf_counter()
+        create_dataset(cursor, args.rows, args.users, args.recipes)
+        print(f"dataset: {args.rows} saves, {args.users} users, {args.recipes} recipes "
+              f"({time.perf_counter() - start:.1f}s)")
+
+        for layout in LAYOUTS:
+            start = time.perf_counter()
+            build_layout(cursor, layout, args.partitions)
+            # A partitioned parent has no storage of its own, so sum the whole tree
+            cursor.execute("""
+                SELECT SUM(pg_total_relation_size(relid))
+                FROM pg_partition_tree('saved_recipes');
+            """)
+            size_mb = cursor.fetchone()[0] / 1024 / 1024
+            print(f"\n{layout}: built in {time.perf_counter() - start:.1f}s, {size_mb:.0f} MB")
+            print(f"  {'query':<22}{'median ms':>12}{'max ms':>10}")
+            rng = random.Random(42)
+            for name, query, repeats in QUERIES:
+                median, worst = time_query(
+                    cursor, query, repeats, args.users, args.recipes, rng, args.explain
+                )
+                print(f"  {name:<22}{median:>12.2f}{worst:>10.2f}")
+    finally:
+        if not args.keep:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;")
+        conn.close()
+
+if __name__ == '__main__':
+    main()
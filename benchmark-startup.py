@@ -0,0 +1,49 @@
+"""Track cold-start cost of the API: module import, create_app and in-memory index load.
+
+Each run happens in a fresh interpreter so nothing is warm. Needs the same
+DATABASE_URL as the app.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RUNS = 5
+
+CHILD = r"""
+import importlib, json, time
+start = time.perf_counter()
+backend = importlib.import_module('flask-backend')
+imported = time.perf_counter()
+app = backend.create_app(start_listeners=False)
+created = time.perf_counter()
+backend.start_change_listener(app)
+loaded = time.perf_counter()
+backend.stop_background_services(app)
+print(json.dumps({
+    'import': imported - start,
+    'create_app': created - imported,
+    'listener': loaded - created,
+    'total': loaded - start,
+}))
+"""
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else RUNS
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', CHILD], check=True, capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{runs} cold starts")
+    print(f"{'phase':<12}{'median ms':>12}{'max ms':>10}")
+    for phase in ('import', 'create_app', 'listener', 'total'):
+        values = [sample[phase] * 1000 for sample in samples]
+        print(f"{phase:<12}{statistics.median(values):>12.1f}{max(values):>10.1f}")
+
+if __name__ == '__main__':
+    main()
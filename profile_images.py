@@ -0,0 +1,109 @@
+"""Profile picture processing, run in a process pool off the Streamlit request thread.
+
+Lives in its own module so worker processes can import it by name.
+"""
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import psycopg2
+from PIL import Image, ImageOps
+
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+MAX_PIXELS = 40_000_000
+PROFILE_PIC_SIZE = (512, 512)
+PROFILE_PIC_FORMAT = 'WEBP'
+PROFILE_PIC_QUALITY = 80
+PROFILE_PIC_WORKERS = 2
+PROFILE_PIC_MAX_PENDING = 8
+
+Image.MAX_IMAGE_PIXELS = MAX_PIXELS
+
+def process_profile_picture(data):
+    """Validate, downscale, strip metadata and re-encode an uploaded image."""
+    if len(data) > MAX_UPLOAD_BYTES:
+        raise ValueError("Profile picture is larger than 10 MB")
+
+    with Image.open(io.BytesIO(data)) as image:
+        image.verify()
+
+    # verify() leaves the image unusable, so decode it again
+    with Image.open(io.BytesIO(data)) as image:
+        image.draft('RGB', PROFILE_PIC_SIZE)
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(PROFILE_PIC_SIZE)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+
+        # Drop EXIF/ICC/XMP so only pixels are re-encoded
+        clean = image.copy()
+        clean.info = {}
+
+    output = io.BytesIO()
+    clean.save(output, format=PROFILE_PIC_FORMAT, quality=PROFILE_PIC_QUALITY)
+    return output.getvalue()
+
+def store_profile_picture(db_params, user_id, data):
+    """Worker entry point: process the upload and write the result to the user's row."""
+    picture = process_profile_picture(data)
+    conn = psycopg2.connect(**db_params)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE users SET profile_picture = %s WHERE user_id = %s;",
+            (picture, user_id)
+        )
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+    return len(picture)
+
+class ProfilePictureQueue:
+    """Bounded process pool for profile picture uploads."""
+
+    def __init__(self, db_params, max_workers=PROFILE_PIC_WORKERS, max_pending=PROFILE_PIC_MAX_PENDING):
+        self._db_params = db_params
+        self._max_workers = max_workers
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor_lock = threading.Lock()
+        self._executor = self._new_executor()
+
+    def _new_executor(self):
+        # spawn rather than fork: the Streamlit server process is multi-threaded
+        return ProcessPoolExecutor(
+            max_workers=self._max_workers,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+
+    def submit(self, user_id, data):
+        """Queue an upload; returns a Future, or None when the queue is full."""
+        if not self._slots.acquire(blocking=False):
+            return None
+        try:
+            future = self._submit(user_id, data)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _submit(self, user_id, data):
+        with self._executor_lock:
+            executor = self._executor
+        try:
+            return executor.submit(store_profile_picture, self._db_params, user_id, data)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory on a huge image), which
+            # breaks the whole pool; replace it rather than fail every upload
+            with self._executor_lock:
+                if self._executor is executor:
+                    self._executor = self._new_executor()
+                    executor.shutdown(wait=False)
+                executor = self._executor
+            return executor.submit(store_profile_picture, self._db_params, user_id, data)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
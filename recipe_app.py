@@ -1,8 +1,16 @@
 import streamlit as st
 import psycopg2
 import hashlib
-from PIL import Image
-import io
+from profile_images import MAX_UPLOAD_BYTES, ProfilePictureQueue
+from save_queue import SaveWriteBehind
+
+DB_PARAMS = {
+    'dbname': "kooky_app",
+    'user': "postgres",
+    'password': "qwerty",
+    'host': "localhost",
+    'port': "5432"
+}
 
 # Initialize all session state attributes
 if 'logged_in' not in st.session_state:
@@ -17,20 +25,44 @@ if 'show_signup' not in st.session_state:
     st.session_state.show_signup = False
 if 'create_recipe' not in st.session_state:
     st.session_state.create_recipe = False
+if 'profile_pic_job' not in st.session_state:
+    st.session_state.profile_pic_job = None
+if 'profile_pic_error' not in st.session_state:
+    st.session_state.profile_pic_error = None
 
 def get_db_connection():
     try:
-        return psycopg2.connect(
-            dbname="kooky_app",
-            user="postgres",
-            password="qwerty",
-            host="localhost",
-            port="5432"
-        )
+        return psycopg2.connect(**DB_PARAMS)
     except psycopg2.Error as e:
         st.error(f"Database connection failed: {e}")
         return None
 
+@st.cache_resource
+def get_profile_picture_queue():
+    return ProfilePictureQueue(DB_PARAMS)
+
+@st.cache_resource
+def get_save_queue():
+    return SaveWriteBehind(DB_PARAMS)
+
+def submit_profile_picture(user_id, uploaded_file):
+    """Hand an upload to the image workers; the result is stored asynchronously.
+
+    Callers rerun straight afterwards, so a rejection is kept in session
+    state and shown on the next run.
+    """
+    if uploaded_file.size > MAX_UPLOAD_BYTES:
+        st.session_state.profile_pic_error = "Profile picture must be 10 MB or smaller."
+        return False
+    future = get_profile_picture_queue().submit(user_id, uploaded_file.getvalue())
+    if future is None:
+        st.session_state.profile_pic_error = (
+            "Too many profile pictures are being processed right now. Please try again shortly."
+        )
+        return False
+    st.session_state.profile_pic_job = future
+    return True
+
 def create_user(username, password, bio, profile_picture, gender, dietary_preferences):
     conn = get_db_connection()
     if not conn:
@@ -137,7 +169,8 @@ def get_user_profile(user_id):
         st.error(f"Error fetching profile: {e}")
         return None
 
-def update_user_profile(user_id, bio, profile_picture, gender, dietary_preferences):
+def update_user_profile(user_id, bio, gender, dietary_preferences):
+    # profile_picture is written only by the image workers (see profile_images.py)
     conn = get_db_connection()
     if not conn:
         return False
@@ -146,9 +179,9 @@ def update_user_profile(user_id, bio, profile_picture, gender, dietary_preferenc
         cursor = conn.cursor()
         cursor.execute("""
             UPDATE users 
-            SET bio = %s, profile_picture = %s, gender = %s, dietary_preferences = %s
+            SET bio = %s, gender = %s, dietary_preferences = %s
             WHERE user_id = %s;
-        """, (bio, profile_picture, gender, dietary_preferences, user_id))
+        """, (bio, gender, dietary_preferences, user_id))
         conn.commit()
         cursor.close()
         conn.close()
@@ -229,15 +262,22 @@ def fetch_saved_recipes(user_id):
     if not conn:
         return []
     
+    # Overlay toggles that are still queued so the user sees their own writes
+    pending = get_save_queue().pending_for_user(user_id)
+    pending_saves = [recipe_id for recipe_id, saved in pending.items() if saved]
+    pending_unsaves = [recipe_id for recipe_id, saved in pending.items() if not saved]
+    
     try:
         cursor = conn.cursor()
         cursor.execute("""
             SELECT r.id, r.title, r.author, r.description, r.ingredients, 
                    r.instructions, r.saved, r.recipe_id, r.user_id 
             FROM recipes r
-            JOIN saved_recipes sr ON r.recipe_id = sr.recipe_id
-            WHERE sr.user_id = %s;
-        """, (user_id,))
+            WHERE (r.recipe_id IN (
+                       SELECT sr.recipe_id FROM saved_recipes sr WHERE sr.user_id = %s
+                   ) OR r.recipe_id = ANY(%s))
+              AND NOT r.recipe_id = ANY(%s);
+        """, (user_id, pending_saves, pending_unsaves))
         recipes = cursor.fetchall()
         cursor.close()
         conn.close()
@@ -247,27 +287,8 @@ def fetch_saved_recipes(user_id):
         return []
 
 def toggle_save_recipe(recipe_id, user_id, is_saved):
-    conn = get_db_connection()
-    if not conn:
-        return
-    
-    try:
-        cursor = conn.cursor()
-        if is_saved:
-            cursor.execute(
-                "DELETE FROM saved_recipes WHERE recipe_id = %s AND user_id = %s;",
-                (recipe_id, user_id)
-            )
-        else:
-            cursor.execute(
-                "INSERT INTO saved_recipes (recipe_id, user_id) VALUES (%s, %s);",
-                (recipe_id, user_id)
-            )
-        conn.commit()
-        cursor.close()
-        conn.close()
-    except psycopg2.Error as e:
-        st.error(f"Error updating saved recipe: {e}")
+    # Queued and written back in batches; see save_queue.py
+    get_save_queue().set_saved(user_id, recipe_id, not is_saved)
 
 def update_recipe(recipe_id, ingredients, instructions):
     conn = get_db_connection()
@@ -287,6 +308,10 @@ def update_recipe(recipe_id, ingredients, instructions):
         st.error(f"Error updating recipe: {e}")
 
 def is_recipe_saved(recipe_id, user_id):
+    pending = get_save_queue().pending_state(user_id, recipe_id)
+    if pending is not None:
+        return pending
+    
     conn = get_db_connection()
     if not conn:
         return False
@@ -433,19 +458,20 @@ if not st.session_state.logged_in:
         
         if st.button("Sign Up"):
             if new_username and new_password:
-                profile_pic_bytes = profile_pic.read() if profile_pic else None
                 dietary_prefs_str = ", ".join(dietary_prefs) if dietary_prefs else None
                 
                 user_id = create_user(
                     new_username, 
                     new_password,
                     bio,
-                    profile_pic_bytes,
+                    None,
                     gender,
                     dietary_prefs_str
                 )
                 
                 if user_id:
+                    if profile_pic:
+                        submit_profile_picture(user_id, profile_pic)
                     st.session_state.logged_in = True
                     st.session_state.user_id = user_id
                     st.success("Account created successfully!")
@@ -471,6 +497,11 @@ if st.session_state.logged_in:
     st.sidebar.title("KOOKY")
     page = st.sidebar.radio("Navigate", ["Dashboard", "Explore", "Profile"])
     
+    # Set by submit_profile_picture just before a rerun
+    if st.session_state.profile_pic_error:
+        st.error(st.session_state.profile_pic_error)
+        st.session_state.profile_pic_error = None
+    
     if page == "Profile":
         st.header("Your Profile")
         profile = get_user_profile(st.session_state.user_id)
@@ -481,11 +512,20 @@ if st.session_state.logged_in:
             # Display current profile info
             st.subheader(f"Welcome, {username}!")
             
-            # Display profile picture if exists
+            # Report on a profile picture still being processed in the background
+            job = st.session_state.profile_pic_job
+            if job:
+                if not job.done():
+                    st.info("Your new profile picture is still being processed.")
+                else:
+                    st.session_state.profile_pic_job = None
+                    if job.exception():
+                        st.error(f"Error processing profile picture: {job.exception()}")
+            
+            # Display profile picture if exists (already downscaled on upload)
             if profile_pic:
                 try:
-                    image = Image.open(io.BytesIO(profile_pic))
-                    st.image(image, width=200)
+                    st.image(bytes(profile_pic), width=200)
                 except Exception as e:
                     st.error(f"Error loading profile picture: {e}")
             
@@ -512,16 +552,16 @@ if st.session_state.logged_in:
             )
             
             if st.button("Update Profile"):
-                new_pic_bytes = new_profile_pic.read() if new_profile_pic else profile_pic
                 new_prefs_str = ", ".join(new_dietary_prefs) if new_dietary_prefs else None
                 
                 if update_user_profile(
                     st.session_state.user_id,
                     new_bio,
-                    new_pic_bytes,
                     new_gender,
                     new_prefs_str
                 ):
+                    if new_profile_pic:
+                        submit_profile_picture(st.session_state.user_id, new_profile_pic)
                     st.success("Profile updated successfully!")
                     st.rerun()
     
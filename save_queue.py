@@ -0,0 +1,149 @@
+"""Write-behind queue for save/unsave toggles from the Streamlit app.
+
+Toggles are collapsed per (user_id, recipe_id) to their final state and
+flushed in one transaction every FLUSH_INTERVAL_SECONDS. Both statements are
+idempotent, so a batch that fails part way (or whose commit is lost) is
+simply retried. The insert relies on the unique (user_id, recipe_id) key
+that saved_recipes_layout.py manages, and skips recipes deleted since the
+toggle was queued.
+
+Only connection-level errors are retried. A batch the database rejects
+outright is written again one toggle at a time, and any toggle it still
+rejects is logged and dropped so it cannot hold up everyone else's.
+"""
+import atexit
+import logging
+import threading
+import time
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+FLUSH_INTERVAL_SECONDS = 0.5
+FLUSH_RETRY_SECONDS = 2
+SHUTDOWN_FLUSH_ATTEMPTS = 3
+# Errors that say nothing about the batch itself, so it is worth retrying
+TRANSIENT_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+logger = logging.getLogger(__name__)
+
+class SaveWriteBehind:
+    """Coalesces save toggles in memory and writes them back in batches."""
+
+    def __init__(self, db_params, flush_interval=FLUSH_INTERVAL_SECONDS):
+        self._db_params = db_params
+        self._flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}
+        self._in_flight = {}
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='save-write-behind', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def set_saved(self, user_id, recipe_id, saved):
+        with self._lock:
+            self._pending[(user_id, recipe_id)] = saved
+
+    def pending_state(self, user_id, recipe_id):
+        """The not-yet-committed saved state for a recipe, or None if nothing is queued."""
+        key = (user_id, recipe_id)
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key]
+            return self._in_flight.get(key)
+
+    def pending_for_user(self, user_id):
+        """{recipe_id: saved} for every uncommitted toggle of this user."""
+        with self._lock:
+            states = {r: s for (u, r), s in self._in_flight.items() if u == user_id}
+            states.update({r: s for (u, r), s in self._pending.items() if u == user_id})
+        return states
+
+    def flush(self):
+        """Write the current batch; on a transient failure it is put back for the next attempt."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._in_flight = batch
+            if not batch:
+                return 0
+            try:
+                try:
+                    self._write(batch)
+                except TRANSIENT_ERRORS:
+                    raise
+                except psycopg2.Error as e:
+                    logger.warning("Batch of %d saved recipe toggles rejected, writing them one by one: %s",
+                                   len(batch), e)
+                    self._write_each(batch)
+            except TRANSIENT_ERRORS:
+                with self._lock:
+                    # Toggles made while this batch was in flight are newer and win
+                    for key, saved in batch.items():
+                        self._pending.setdefault(key, saved)
+                    self._in_flight = {}
+                raise
+            with self._lock:
+                self._in_flight = {}
+            return len(batch)
+
+    def _write_each(self, batch):
+        for key, saved in batch.items():
+            try:
+                self._write({key: saved})
+            except TRANSIENT_ERRORS:
+                raise
+            except psycopg2.Error as e:
+                logger.error("Dropping saved recipe toggle %s (saved=%s): %s", key, saved, e)
+
+    def _write(self, batch):
+        saves = [key for key, saved in batch.items() if saved]
+        unsaves = [key for key, saved in batch.items() if not saved]
+        conn = psycopg2.connect(**self._db_params)
+        try:
+            with conn:
+                with conn.cursor() as cursor:
+                    if unsaves:
+                        execute_values(cursor, """
+                            DELETE FROM saved_recipes sr
+                            USING (VALUES %s) AS v(user_id, recipe_id)
+                            WHERE sr.user_id = v.user_id AND sr.recipe_id = v.recipe_id;
+                        """, unsaves)
+                    if saves:
+                        execute_values(cursor, """
+                            INSERT INTO saved_recipes (user_id, recipe_id)
+                            SELECT v.user_id, v.recipe_id
+                            FROM (VALUES %s) AS v(user_id, recipe_id)
+                            JOIN recipes r ON r.recipe_id = v.recipe_id
+                            ON CONFLICT DO NOTHING;
+                        """, saves)
+        finally:
+            conn.close()
+
+    def _run(self):
+        delay = self._flush_interval
+        while not self._stopped.wait(delay):
+            try:
+                self.flush()
+                delay = self._flush_interval
+            except psycopg2.Error as e:
+                logger.warning("Flushing saved recipes failed, retrying: %s", e)
+                delay = FLUSH_RETRY_SECONDS
+
+    def close(self):
+        """Stop the flusher and write out everything still queued."""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._thread.join()
+        for attempt in range(SHUTDOWN_FLUSH_ATTEMPTS):
+            try:
+                self.flush()
+                return
+            except psycopg2.Error as e:
+                logger.warning("Final flush of saved recipes failed (attempt %d): %s", attempt + 1, e)
+                if attempt + 1 < SHUTDOWN_FLUSH_ATTEMPTS:
+                    time.sleep(FLUSH_RETRY_SECONDS)
+        logger.error("Dropping %d unsaved recipe toggles at shutdown", len(self._pending))
@@ -0,0 +1,83 @@
+"""Production entry point: N preforked gunicorn workers sharing a preloaded app.
+
+Configuration comes from the environment (see load_config in flask-backend.py)
+plus BIND, WEB_CONCURRENCY, WORKER_THREADS and GRACEFUL_TIMEOUT.
+"""
+import gc
+import importlib
+import multiprocessing
+import os
+
+from gunicorn.app.base import BaseApplication
+
+backend = importlib.import_module('flask-backend')
+
+class KookyServer(BaseApplication):
+    def __init__(self, application, options):
+        self.application = application
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        return self.application
+
+def main():
+    # Imports, config, schema setup and the in-memory views are built once in
+    # the master and shared copy-on-write; workers only catch up on changes.
+    app = backend.create_app(start_listeners=False)
+    master_listener = backend.start_change_listener(app)
+    backend.register_fork_handlers(app)
+    # Nothing pooled may be inherited: a child closing it would end the session for everyone
+    with app.app_context():
+        backend.db.engine.dispose()
+    worker_conns = {}
+
+    def pre_fork(server, worker):
+        # The worker's LISTEN starts before the master's views catch up, so
+        # every change is in the inherited views, delivered to the worker, or
+        # both (applying a change twice is harmless)
+        worker_conns[worker] = backend.open_listen_connection(app.config['SQLALCHEMY_DATABASE_URI'])
+        if not master_listener.sync(timeout=server.timeout):
+            server.log.warning("Change listener did not catch up before forking %s", worker)
+        # Keep the preloaded objects out of the collector so workers don't
+        # dirty the shared pages by touching their GC headers
+        gc.freeze()
+
+    def post_fork(server, worker):
+        conn = worker_conns.pop(worker)
+        for other in worker_conns.values():
+            backend.detach_connection(other)
+        master_listener.detach()
+        backend.start_change_listener(app, conn)
+
+    def child_exit(server, worker):
+        conn = worker_conns.pop(worker, None)
+        if conn is not None:
+            conn.close()
+
+    def worker_exit(server, worker):
+        backend.stop_background_services(app)
+
+    def on_exit(server):
+        backend.stop_change_listener(app)
+
+    options = {
+        'bind': os.environ.get('BIND', '0.0.0.0:8000'),
+        'workers': int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count())),
+        'threads': int(os.environ.get('WORKER_THREADS', 1)),
+        'graceful_timeout': int(os.environ.get('GRACEFUL_TIMEOUT', 30)),
+        'preload_app': True,
+        'pre_fork': pre_fork,
+        'post_fork': post_fork,
+        'child_exit': child_exit,
+        'worker_exit': worker_exit,
+        'on_exit': on_exit,
+    }
+    KookyServer(app, options).run()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Crash and retry behaviour of the save/unsave write-behind queue."""
+import pytest
+
+psycopg2 = pytest.importorskip('psycopg2')
+
+import save_queue
+from save_queue import SaveWriteBehind
+
+@pytest.fixture
+def queue(monkeypatch):
+    monkeypatch.setattr(save_queue, 'FLUSH_RETRY_SECONDS', 0)
+    # A long interval keeps the background flusher out of the way
+    queue = SaveWriteBehind({}, flush_interval=3600)
+    yield queue
+    queue._write = lambda batch: None
+    queue.close()
+
+def failing_write(batch):
+    raise psycopg2.OperationalError("database is down")
+
+def test_toggles_collapse_to_final_state(queue):
+    written = []
+    queue._write = written.append
+    queue.set_saved(1, 5, True)
+    queue.set_saved(1, 5, False)
+    queue.set_saved(1, 5, True)
+
+    assert queue.flush() == 1
+    assert written == [{(1, 5): True}]
+
+def test_failed_batch_is_put_back(queue):
+    queue._write = failing_write
+    queue.set_saved(1, 5, True)
+    queue.set_saved(2, 7, False)
+
+    with pytest.raises(psycopg2.OperationalError):
+        queue.flush()
+
+    assert queue.pending_state(1, 5) is True
+    assert queue.pending_state(2, 7) is False
+    assert queue._in_flight == {}
+
+    written = []
+    queue._write = written.append
+    assert queue.flush() == 2
+    assert written == [{(1, 5): True, (2, 7): False}]
+    assert queue.pending_state(1, 5) is None
+
+def test_rejected_toggle_does_not_block_later_ones(queue):
+    written = []
+
+    def reject_deleted_recipe(batch):
+        if (1, 5) in batch:
+            raise psycopg2.IntegrityError("recipe 5 was deleted")
+        written.append(dict(batch))
+
+    queue._write = reject_deleted_recipe
+    queue.set_saved(1, 5, True)
+    queue.set_saved(2, 7, True)
+
+    assert queue.flush() == 2
+    assert written == [{(2, 7): True}]
+    assert queue.pending_state(1, 5) is None
+
+    queue.set_saved(3, 9, True)
+    assert queue.flush() == 1
+    assert written == [{(2, 7): True}, {(3, 9): True}]
+    assert queue.pending_for_user(1) == {}
+
+def test_toggles_made_during_failed_flush_win(queue):
+    def write_then_fail(batch):
+        # The user toggles again while the batch is in flight
+        assert queue.pending_state(1, 5) is True
+        queue.set_saved(1, 5, False)
+        raise psycopg2.OperationalError("connection reset")
+
+    queue._write = write_then_fail
+    queue.set_saved(1, 5, True)
+    queue.set_saved(2, 7, True)
+
+    with pytest.raises(psycopg2.OperationalError):
+        queue.flush()
+
+    assert queue.pending_state(1, 5) is False
+    assert queue.pending_state(2, 7) is True
+
+def test_close_retries_then_drains(queue):
+    attempts = []
+    written = []
+
+    def flaky_write(batch):
+        attempts.append(dict(batch))
+        if len(attempts) < save_queue.SHUTDOWN_FLUSH_ATTEMPTS:
+            raise psycopg2.OperationalError("database is restarting")
+        written.append(dict(batch))
+
+    queue._write = flaky_write
+    queue.set_saved(1, 5, True)
+    queue.set_saved(3, 9, False)
+    queue.close()
+
+    assert len(attempts) == save_queue.SHUTDOWN_FLUSH_ATTEMPTS
+    assert written == [{(1, 5): True, (3, 9): False}]
+    assert queue.pending_for_user(1) == {}
+    assert queue.pending_for_user(3) == {}